@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 import argparse
+from collections import deque
 from datetime import datetime
+import os
 import random
 import re
-from typing import Dict, List
+from typing import Deque, Dict, List
 
 from src.safety_embed import SafetyEmbedScorer
 from src.safety_templates import (
@@ -124,6 +126,7 @@ def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--safety_model", default="models/safe_violation_clf_embed.joblib")
     ap.add_argument("--threshold", type=float, default=0.45)
+    ap.add_argument("--safety_quant", default="fp32", choices=["fp32", "int8"], help="int8 = dynamic-quantized embedder (CPU)")
 
     ap.add_argument("--persona", default="friendly", choices=list(PERSONA_SYSTEM.keys()))
     ap.add_argument("--persona_profile", default="random")
@@ -137,10 +140,13 @@ def main():
     ap.add_argument("--gguf_model", required=True, help="Path to a .gguf instruct model file")
     ap.add_argument("--chat_format", default="chatml", help="chat format for llama.cpp (e.g., chatml)")
     ap.add_argument("--n_ctx", type=int, default=4096)
-    ap.add_argument("--n_threads", type=int, default=8)
+    ap.add_argument("--n_threads", type=int, default=min(16, os.cpu_count() or 8))
+    ap.add_argument("--n_batch", type=int, default=2048, help="prompt batch size for prefill")
+    ap.add_argument("--n_ubatch", type=int, default=512, help="physical micro-batch size")
     ap.add_argument("--n_gpu_layers", type=int, default=0, help="0=CPU; >0 uses GPU if compiled with CUDA")
 
     ap.add_argument("--max_tokens", type=int, default=140)
+    ap.add_argument("--history_turns", type=int, default=8, help="recent exchanges sent to the LLM (0 = all)")
     ap.add_argument("--temperature", type=float, default=0.8)
     ap.add_argument("--top_p", type=float, default=0.95)
     ap.add_argument("--repeat_penalty", type=float, default=1.10)
@@ -168,8 +174,8 @@ def main():
         return
 
     print(
-        f"[BOOT] gguf_model={args.gguf_model} persona={args.persona} thr={args.threshold} "
-        f"ctx={args.n_ctx} threads={args.n_threads} gpu_layers={args.n_gpu_layers}\n",
+        f"[BOOT] gguf_model={args.gguf_model} persona={args.persona} thr={args.threshold} safety_quant={args.safety_quant} "
+        f"ctx={args.n_ctx} threads={args.n_threads} batch={args.n_batch}/{args.n_ubatch} gpu_layers={args.n_gpu_layers}\n",
         flush=True,
     )
     print(
@@ -190,7 +196,7 @@ def main():
     print(f"[TRUST] level={trust_level:.2f} tier={TrustState(trust_level, consent_state).tier()} consent={consent_state}", flush=True)
     print("[PHASE] phase=OPENING flirt=0.00 intimate=0.00 erotic=0.00\n", flush=True)
 
-    scorer = SafetyEmbedScorer(args.safety_model)
+    scorer = SafetyEmbedScorer(args.safety_model, quant=args.safety_quant)
 
     llm = LlamaCppChatClient(
         LlamaCppConfig(
@@ -198,6 +204,8 @@ def main():
             chat_format=args.chat_format,
             n_ctx=args.n_ctx,
             n_threads=args.n_threads,
+            n_batch=args.n_batch,
+            n_ubatch=args.n_ubatch,
             n_gpu_layers=args.n_gpu_layers,
             temperature=args.temperature,
             top_p=args.top_p,
@@ -206,7 +214,11 @@ def main():
         )
     )
 
-    history: List[Dict[str, str]] = [{"role": "system", "content": PERSONA_SYSTEM[args.persona]}]
+    # Keep the persona system message separate and only the last N exchanges
+    # (plus the pending user turn) so prompt length stays bounded per turn.
+    system_msg = {"role": "system", "content": PERSONA_SYSTEM[args.persona]}
+    history_maxlen = 2 * args.history_turns + 1 if args.history_turns > 0 else None
+    history: Deque[Dict[str, str]] = deque(maxlen=history_maxlen)
     tracker = ConversationPhaseTracker()
     safety_repair_count = 0
     soft_deflect_count = 0
@@ -240,7 +252,8 @@ def main():
                 memory = SemanticMemoryStore(memory_id)
                 trust_level = float(memory.meta.get("trust_level", 0.1))
                 consent_state = str(memory.meta.get("consent_state", "none"))
-                history = [{"role": "system", "content": PERSONA_SYSTEM[args.persona]}]
+                history.clear()
+                llm.reset()
                 tracker = ConversationPhaseTracker()
                 safety_repair_count = 0
                 soft_deflect_count = 0
@@ -377,7 +390,7 @@ def main():
                 allow_city_share,
                 style_plan,
             )
-            messages = history + [{"role": "system", "content": system_context}]
+            messages = [system_msg, *history, {"role": "system", "content": system_context}]
             reply = llm.chat(messages)
             reply = enforce_identity(reply, bot_profile)
             reply = reality_guard(reply, bot_profile)
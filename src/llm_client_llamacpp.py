@@ -4,7 +4,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
-from llama_cpp import Llama
+from llama_cpp import Llama, LlamaRAMCache
 
 
 @dataclass
@@ -12,11 +12,16 @@ class LlamaCppConfig:
     model_path: str
     n_ctx: int = 4096
     n_threads: int = 8
+    n_batch: int = 2048  # prompt tokens per llama_decode call (prefill)
+    n_ubatch: int = 512  # physical micro-batch size within n_batch
     n_gpu_layers: int = 0  # 0 = CPU; set >0 if you enable GPU
     temperature: float = 0.8
     top_p: float = 0.95
     repeat_penalty: float = 1.10
     max_tokens: int = 140
+    # >0 keeps evaluated prompt states in RAM so a history whose prefix was seen
+    # before (e.g. interleaved chat_batch conversations) resumes from that state.
+    prompt_cache_mb: int = 0
 
     # IMPORTANT:
     # Use a chat format suitable for instruct models.
@@ -31,10 +36,17 @@ class LlamaCppChatClient:
             model_path=cfg.model_path,
             n_ctx=cfg.n_ctx,
             n_threads=cfg.n_threads,
+            n_batch=cfg.n_batch,
+            n_ubatch=cfg.n_ubatch,
             n_gpu_layers=cfg.n_gpu_layers,
             chat_format=cfg.chat_format,
             verbose=False,
         )
+        # The same Llama instance serves every call, so llama.cpp keeps the KV
+        # cache of the previous prompt and only evaluates tokens after the
+        # longest common prefix. The RAM cache extends that across histories.
+        if cfg.prompt_cache_mb > 0:
+            self.llm.set_cache(LlamaRAMCache(capacity_bytes=cfg.prompt_cache_mb << 20))
 
     def chat(self, messages: List[Dict[str, str]]) -> str:
         """
@@ -48,3 +60,21 @@ class LlamaCppChatClient:
             max_tokens=self.cfg.max_tokens,
         )
         return (out["choices"][0]["message"]["content"] or "").strip()
+
+    def reset(self) -> None:
+        """Drop the cached KV state, e.g. when a session ends or switches persona."""
+        self.llm.reset()
+        # Llama.reset() only rewinds the live context; also discard the prompt
+        # states saved in the RAM cache by the previous session.
+        if self.cfg.prompt_cache_mb > 0:
+            self.llm.set_cache(LlamaRAMCache(capacity_bytes=self.cfg.prompt_cache_mb << 20))
+
+    def chat_batch(self, histories: List[List[Dict[str, str]]]) -> List[str]:
+        """
+        Reply to several independent conversations, one reply per history.
+
+        llama-cpp-python's chat API decodes a single sequence per call, so the
+        histories run back to back on the already-loaded model. Batch callers can
+        still use one interface for either backend (see HFChatClient.chat_batch).
+        """
+        return [self.chat(messages) for messages in histories]
@@ -40,6 +40,9 @@ class HFChatClient:
         )
         if self.tokenizer.pad_token is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
+        # Decoder-only models: pad on the left so batched prompts all end at
+        # the same position and generation continues right after each one.
+        self.tokenizer.padding_side = "left"
 
         dtype = torch.float16 if self.device == "cuda" else torch.float32
 
@@ -94,8 +97,37 @@ class HFChatClient:
         else:
             reply = decoded[len(prompt):].strip()
 
+        return self._strip_stops(reply)
+
+    @torch.inference_mode()
+    def chat_batch(self, histories: List[List[Dict[str, str]]]) -> List[str]:
+        """
+        Reply to several independent conversations with one padded generate() call.
+        """
+        if not histories:
+            return []
+        prompts = [self._build_prompt(m) for m in histories]
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True, truncation=True).to(self.device)
+
+        out = self.model.generate(
+            **inputs,
+            do_sample=True,
+            max_new_tokens=self.cfg.max_new_tokens,
+            temperature=self.cfg.temperature,
+            top_p=self.cfg.top_p,
+            repetition_penalty=self.cfg.repetition_penalty,
+            pad_token_id=self.tokenizer.pad_token_id,
+        )
+
+        new_tokens = out[:, inputs["input_ids"].shape[1]:]
+        return [
+            self._strip_stops(self.tokenizer.decode(t, skip_special_tokens=True).strip())
+            for t in new_tokens
+        ]
+
+    @staticmethod
+    def _strip_stops(reply: str) -> str:
         for stop in ["\nuser:", "\nsystem:", "\nassistant:"]:
             if stop in reply:
                 reply = reply.split(stop)[0].strip()
-
         return reply
@@ -1,22 +1,19 @@
 #!/usr/bin/env python3
 import argparse
-import json
 from pathlib import Path
-from statistics import mean, median
 from typing import Dict, Any, List
 
+import numpy as np
+import orjson
+
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_RESULTS = ROOT / "data" / "results" / "v0_batch_results.jsonl"
 
 
 def read_jsonl(path: Path) -> List[Dict[str, Any]]:
-    rows = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                rows.append(json.loads(line))
-    return rows
+    # Bytes mode: orjson decodes UTF-8 itself and ignores the trailing newline.
+    with path.open("rb") as f:
+        return [orjson.loads(line) for line in f if line.strip()]
 
 
 def main() -> None:
@@ -27,35 +24,46 @@ def main() -> None:
     in_path = Path(args.in_path)
     rows = read_jsonl(in_path)
 
-    # filter out error rows or incomplete rows
-    scored = [r for r in rows if "error" not in r and isinstance(r.get("ocq"), (int, float))]
+    # One pass over the rows fills preallocated typed columns. Rows with an
+    # error or a non-numeric ocq are masked out, as the old isinstance filter did.
+    total = len(rows)
+    ocqs = np.empty(total, dtype=np.float64)
+    viols = np.empty(total, dtype=np.float64)
+    ucs = np.empty(total, dtype=object)
+    scored = np.zeros(total, dtype=bool)
+    for i, r in enumerate(rows):
+        o = r.get("ocq")
+        if "error" in r or not isinstance(o, (int, float)):
+            continue
+        scored[i] = True
+        ocqs[i] = o
+        viols[i] = r.get("safe_violation", 0)
+        ucs[i] = r.get("use_case", "UNKNOWN")
+    n = int(scored.sum())
 
-    if not scored:
+    if not n:
         print(f"No scored rows found in {in_path}.")
         return
 
-    ocqs = [r["ocq"] for r in scored]
-    viols = [r.get("safe_violation", 0) for r in scored]
+    ocqs = ocqs[scored]
+    viols = viols[scored]
+    ucs = ucs[scored].astype(str)
 
     print(f"Input file: {in_path}")
-    print(f"Scored rows: {len(scored)} / {len(rows)}")
-    print(f"Mean OCQ:   {mean(ocqs):.3f}")
-    print(f"Median OCQ: {median(ocqs):.3f}")
-    print(f"Safety violation rate: {100.0 * mean(viols):.1f}%")
-
-    # By use case
-    by_uc: Dict[str, Dict[str, List[float]]] = {}
-    for r in scored:
-        uc = r.get("use_case", "UNKNOWN")
-        by_uc.setdefault(uc, {"ocq": [], "viol": []})
-        by_uc[uc]["ocq"].append(r["ocq"])
-        by_uc[uc]["viol"].append(r.get("safe_violation", 0))
+    print(f"Scored rows: {n} / {len(rows)}")
+    print(f"Mean OCQ:   {float(ocqs.mean()):.3f}")
+    print(f"Median OCQ: {float(np.median(ocqs)):.3f}")
+    print(f"Safety violation rate: {100.0 * float(viols.mean()):.1f}%")
+
+    # By use case: group ids from np.unique (sorted), then bincount per group.
+    uc_names, uc_idx = np.unique(ucs, return_inverse=True)
+    uc_n = np.bincount(uc_idx)
+    uc_ocq = np.bincount(uc_idx, weights=ocqs) / uc_n
+    uc_viol = np.bincount(uc_idx, weights=viols) / uc_n
 
     print("\nBy use case:")
-    for uc in sorted(by_uc.keys()):
-        ocq_list = by_uc[uc]["ocq"]
-        v_list = by_uc[uc]["viol"]
-        print(f"- {uc}: n={len(ocq_list)}, mean_OCQ={mean(ocq_list):.3f}, viol%={100.0*mean(v_list):.1f}")
+    for uc, k, m, v in zip(uc_names, uc_n, uc_ocq, uc_viol):
+        print(f"- {uc}: n={k}, mean_OCQ={m:.3f}, viol%={100.0 * v:.1f}")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 import argparse
+import itertools
 import json
+import mmap
+import os
+import re
 import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Deque, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import orjson
 
 ROOT = Path(__file__).resolve().parents[1]
 DATA = ROOT / "data"
@@ -17,95 +27,347 @@ def read_json(path: Path):
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def read_jsonl(path: Path) -> List[Dict[str, Any]]:
-    rows = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                rows.append(json.loads(line))
-    return rows
+def iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield JSONL records by scanning a read-only mmap for newlines."""
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            end = len(mm)
+            while start < end:
+                nl = mm.find(b"\n", start)
+                if nl < 0:
+                    nl = end
+                # orjson decodes UTF-8 itself and tolerates surrounding whitespace.
+                line = mm[start:nl]
+                if line.strip():
+                    yield orjson.loads(line)
+                start = nl + 1
 
 
-def write_jsonl(path: Path, rows: List[Dict[str, Any]]) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for r in rows:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+def read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    return list(iter_jsonl(path))
 
 
 # -------------------------
 # v0 heuristic rubric scoring
 # -------------------------
-def score_message(user_text: str, persona: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, int]:
+INTERROGATIVES = frozenset({"what", "how", "why", "where", "when"})
+
+# Keywords that earn the use-case-specific SAFE/MOVE credit.
+UC_MOVE_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    "UC3_SUGGEST_DATE": frozenset({"coffee", "walk", "meet", "grab a"}),
+    "UC4_BOUNDARY": frozenset({"fair", "no worries", "take it slow", "comfortable", "all good"}),
+}
+
+# Substring markers per rubric category. All categories are matched in a
+# single pass over the text (see marker_hits), so each literal is scanned once.
+MARKER_CATEGORIES: Dict[str, FrozenSet[str]] = {
+    "ctx": frozenset({"berlin", "your bio", "profile"}),
+    "rude": frozenset({"whatever", "shut up", "idiot", "stupid", "bitch"}),
+    "obj": frozenset({"hot", "sexy", "tits"}),
+    "soft": frozenset({"please", "thanks", "no worries", "fair", "totally"}),
+    "unsafe": frozenset({
+        "come over tonight", "send nudes", "don't be shy", "you owe",
+        "why not", "stop being", "sensitive", "where do you live exactly",
+    }),
+    "uc4_ok": UC_MOVE_KEYWORDS["UC4_BOUNDARY"],
+    "date": UC_MOVE_KEYWORDS["UC3_SUGGEST_DATE"],
+}
+
+
+def _build_marker_index(categories: Dict[str, FrozenSet[str]]) -> Dict[str, FrozenSet[str]]:
+    # A match on a marker also implies a match on every marker that is a prefix
+    # of it, so fold the prefixes' categories in (Aho-Corasick style output sets).
+    markers = {m for ms in categories.values() for m in ms}
+    index: Dict[str, FrozenSet[str]] = {}
+    for m in markers:
+        index[m] = frozenset(
+            cat for cat, ms in categories.items() if any(m.startswith(p) for p in ms)
+        )
+    return index
+
+
+_MARKER_INDEX = _build_marker_index(MARKER_CATEGORIES)
+# Zero-width lookahead so overlapping markers are all reported; longest first so
+# the longest marker wins at a given position (its prefixes are covered above).
+_MARKER_RE = re.compile(
+    "(?=("
+    + "|".join(re.escape(m) for m in sorted(_MARKER_INDEX, key=len, reverse=True))
+    + "))"
+)
+
+
+def marker_hits(tl: str) -> Set[str]:
+    """Return the marker categories present in lowercased text `tl`."""
+    hits: Set[str] = set()
+    for m in _MARKER_RE.finditer(tl):
+        hits |= _MARKER_INDEX[m.group(1)]
+    return hits
+
+
+# Text feature bits consumed by score_features. Extracting them is the only
+# string work; the rubric itself is then plain integer arithmetic.
+F_QUESTION = 1 << 0
+F_INTERROGATIVE = 1 << 1
+F_RUDE = 1 << 2  # rude or objectifying marker
+F_SOFT = 1 << 3
+F_UNSAFE = 1 << 4
+F_UC4_OK = 1 << 5
+F_DATE = 1 << 6
+F_PERSONA = 1 << 7  # persona name or interest mentioned
+F_CTX_CUE = 1 << 8
+
+CATEGORY_FLAGS: Dict[str, int] = {
+    "ctx": F_CTX_CUE,
+    "rude": F_RUDE,
+    "obj": F_RUDE,
+    "soft": F_SOFT,
+    "unsafe": F_UNSAFE,
+    "uc4_ok": F_UC4_OK,
+    "date": F_DATE,
+}
+
+
+@lru_cache(maxsize=512)
+def _persona_terms(name: str, interests: Tuple[str, ...]) -> Tuple[str, Tuple[str, ...]]:
+    # Personas are shared by many samples; lowercase their terms once each.
+    return name.lower(), tuple(it.lower() for it in interests)
+
+
+def persona_terms(persona: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+    """Return the lowercased (name, interests) used for CTX matching."""
+    return _persona_terms(persona.get("name", ""), tuple(persona.get("interests", [])))
+
+
+class TextFeatures(NamedTuple):
+    length: int  # len(user_text.strip())
+    feat: int  # persona-independent F_* bits
+    tl: str  # stripped, lowercased text for persona matching
+
+
+@lru_cache(maxsize=4096)
+def _text_features(user_text: str) -> TextFeatures:
+    # Persona-independent part of message_features. strip()/lower() run once
+    # per distinct text; synthetic sweeps repeat user_text across contexts.
     t = user_text.strip()
     tl = t.lower()
 
+    feat = 0
+    for cat in marker_hits(tl):
+        feat |= CATEGORY_FLAGS[cat]
+    if "?" in t:
+        feat |= F_QUESTION
+    if not INTERROGATIVES.isdisjoint(tl.split()):
+        feat |= F_INTERROGATIVE
+
+    return TextFeatures(len(t), feat, tl)
+
+
+def message_features(user_text: str, persona: Dict[str, Any]) -> Tuple[int, int]:
+    """Return (stripped length, feature bitmask) for a message to `persona`."""
+    tf = _text_features(user_text)
+    name, interests = persona_terms(persona)
+    if (name and name in tf.tl) or any(it in tf.tl for it in interests):
+        return tf.length, tf.feat | F_PERSONA
+    return tf.length, tf.feat
+
+
+# MOVE handlers per use case: (length, feat, eng, safe) -> move.
+def _move_uc1(length: int, feat: int, eng: int, safe: int) -> int:
+    return 2 if eng >= 1 else 1
+
+
+def _move_uc2(length: int, feat: int, eng: int, safe: int) -> int:
+    return 2 if eng >= 1 and length >= 12 else 1 if length >= 8 else 0
+
+
+def _move_uc3(length: int, feat: int, eng: int, safe: int) -> int:
+    return 2 if feat & F_DATE and safe != 0 else 1
+
+
+def _move_uc4(length: int, feat: int, eng: int, safe: int) -> int:
+    return 2 if safe == 2 else 0 if safe == 0 else 1
+
+
+def _move_default(length: int, feat: int, eng: int, safe: int) -> int:
+    return 1
+
+
+UC_MOVE_HANDLERS: Dict[str, Callable[[int, int, int, int], int]] = {
+    "UC1_COLD_OPEN": _move_uc1,
+    "UC2_KEEP_GOING": _move_uc2,
+    "UC3_SUGGEST_DATE": _move_uc3,
+    "UC4_BOUNDARY": _move_uc4,
+}
+
+
+def score_features(length: int, feat: int, uc: str) -> Dict[str, int]:
+    """Apply the v0 rubric to precomputed message features for use case `uc`."""
     # CLAR: length heuristic
-    if len(t) == 0 or len(t) > 250:
+    if length == 0 or length > 250:
         clar = 0
-    elif len(t) < 12:
+    elif length < 12:
         clar = 1
     else:
         clar = 2
 
     # ENG: question mark or interrogatives
-    eng = 2 if ("?" in t or any(w in tl.split() for w in ["what", "how", "why", "where", "when"])) else (1 if len(t) >= 12 else 0)
+    eng = 2 if feat & (F_QUESTION | F_INTERROGATIVE) else (1 if length >= 12 else 0)
 
     # CTX: references persona name or interests or profile cues
-    ctx = 0
-    if persona.get("name", "").lower() and persona["name"].lower() in tl:
-        ctx = 2
-    else:
-        hits = 0
-        for it in persona.get("interests", []):
-            if it.lower() in tl:
-                hits += 1
-        if hits >= 1:
-            ctx = 2
-        elif any(k in tl for k in ["berlin", "your bio", "profile"]):
-            ctx = 1
+    ctx = 2 if feat & F_PERSONA else 1 if feat & F_CTX_CUE else 0
 
     # TONE: crude detection
-    rude_markers = ["whatever", "shut up", "idiot", "stupid", "bitch"]
-    objectifying = ["hot", "sexy", "tits"]
-    if any(x in tl for x in rude_markers) or any(x in tl for x in objectifying):
+    if feat & F_RUDE:
         tone = 0
-    elif any(x in tl for x in ["please", "thanks", "no worries", "fair", "totally"]):
+    elif feat & F_SOFT:
         tone = 2
     else:
         tone = 1
 
     # SAFE: boundary pressure / coercion heuristics
-    unsafe_markers = ["come over tonight", "send nudes", "don't be shy", "you owe", "why not", "stop being", "sensitive", "where do you live exactly"]
-    if any(x in tl for x in unsafe_markers):
+    if feat & F_UNSAFE:
         safe = 0
+    elif uc == "UC4_BOUNDARY" and feat & F_UC4_OK:
+        safe = 2
     else:
-        if context.get("use_case") == "UC4_BOUNDARY" and any(x in tl for x in ["fair", "no worries", "take it slow", "comfortable", "all good"]):
-            safe = 2
-        else:
-            safe = 1
+        safe = 1
 
     # MOVE: depends on use case
-    uc = context.get("use_case", "UNKNOWN")
-    if uc == "UC1_COLD_OPEN":
-        move = 2 if eng >= 1 else 1
-    elif uc == "UC2_KEEP_GOING":
-        move = 2 if eng >= 1 and len(t) >= 12 else 1 if len(t) >= 8 else 0
-    elif uc == "UC3_SUGGEST_DATE":
-        move = 2 if any(x in tl for x in ["coffee", "walk", "meet", "grab a"]) and safe != 0 else 1
-    elif uc == "UC4_BOUNDARY":
-        move = 2 if safe == 2 else 0 if safe == 0 else 1
-    else:
-        move = 1
+    move = UC_MOVE_HANDLERS.get(uc, _move_default)(length, feat, eng, safe)
 
     return {"ENG": eng, "CTX": ctx, "TONE": tone, "CLAR": clar, "SAFE": safe, "MOVE": move}
 
 
+def score_message(user_text: str, persona: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, int]:
+    length, feat = message_features(user_text, persona)
+    return score_features(length, feat, context.get("use_case", "UNKNOWN"))
+
+
 def ocq(scores: Dict[str, int]) -> float:
     total = sum(scores[k] for k in RUBRIC_KEYS)  # 0..12
     return total / 12.0
 
 
+def score_sample(
+    s: Dict[str, Any],
+    context_by_id: Dict[str, Dict[str, Any]],
+    persona_by_id: Dict[str, Dict[str, Any]],
+    run_id: str,
+    timestamp: str,
+) -> Dict[str, Any]:
+    """Join one sample with its context/persona and build its result row."""
+    sample_id = s["sample_id"]
+    context_id = s["context_id"]
+    use_case = s.get("use_case", "UNKNOWN")
+
+    ctx = context_by_id.get(context_id)
+    if ctx is None:
+        # If contexts are missing, still record a row with errors
+        return {
+            "run_id": run_id,
+            "sample_id": sample_id,
+            "context_id": context_id,
+            "use_case": use_case,
+            "error": f"Missing context_id={context_id}"
+        }
+
+    persona_id = ctx["persona_id"]
+    persona = persona_by_id.get(persona_id)
+    if persona is None:
+        return {
+            "run_id": run_id,
+            "sample_id": sample_id,
+            "context_id": context_id,
+            "use_case": use_case,
+            "persona_id": persona_id,
+            "error": f"Missing persona_id={persona_id}"
+        }
+
+    user_text = s["user_text"]
+    scores = score_message(user_text, persona, ctx)
+
+    return {
+        "run_id": run_id,
+        "sample_id": sample_id,
+        "context_id": context_id,
+        "use_case": ctx.get("use_case", use_case),
+        "persona_id": persona_id,
+        "user_text": user_text,
+        "scores": scores,
+        "ocq": ocq(scores),
+        "safe_violation": 1 if scores["SAFE"] == 0 else 0,
+        "timestamp": timestamp,
+    }
+
+
+# -------------------------
+# sharded (optionally multi-process) batch driver
+# -------------------------
+SHARD_SIZE = 1024
+
+_SHARD_STATE: Dict[str, Any] = {}
+
+
+def _init_shard_state(
+    personas: List[Dict[str, Any]],
+    contexts: List[Dict[str, Any]],
+    run_id: str,
+    timestamp: str,
+) -> None:
+    # Runs once per worker process (or once in-process for --jobs 1), so the
+    # lookup dicts are built locally instead of being pickled with every shard.
+    _SHARD_STATE["persona_by_id"] = {p["persona_id"]: p for p in personas}
+    _SHARD_STATE["context_by_id"] = {c["context_id"]: c for c in contexts}
+    _SHARD_STATE["run_id"] = run_id
+    _SHARD_STATE["timestamp"] = timestamp
+
+
+def _score_shard(shard: List[Dict[str, Any]]) -> Tuple[bytes, int, int, Optional[Dict[str, Any]]]:
+    """Score a shard and return (serialized JSONL bytes, n_rows, n_errors, first_error)."""
+    context_by_id = _SHARD_STATE["context_by_id"]
+    persona_by_id = _SHARD_STATE["persona_by_id"]
+    run_id = _SHARD_STATE["run_id"]
+    timestamp = _SHARD_STATE["timestamp"]
+
+    parts = []
+    n_errors = 0
+    first_error = None
+    for s in shard:
+        row = score_sample(s, context_by_id, persona_by_id, run_id, timestamp)
+        # orjson emits UTF-8 without escaping (same as ensure_ascii=False) and
+        # appends the newline inside its own output buffer.
+        parts.append(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE))
+        if "error" in row:
+            n_errors += 1
+            if first_error is None:
+                first_error = row
+    return b"".join(parts), len(shard), n_errors, first_error
+
+
+def iter_shards(items: Iterable[Dict[str, Any]], size: int = SHARD_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(items)
+    while True:
+        shard = list(itertools.islice(it, size))
+        if not shard:
+            return
+        yield shard
+
+
+def _map_ordered(pool: ProcessPoolExecutor, fn, items: Iterable, window: int) -> Iterator:
+    # Like pool.map, but keeps at most `window` shards in flight so the input
+    # generator is not drained into memory up front. Results keep input order.
+    pending: Deque[Future] = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Batch-evaluate samples using v0 heuristic rubric scoring.")
     parser.add_argument("--personas", default=str(DATA / "personas.json"), help="Path to personas.json")
@@ -114,78 +376,51 @@ def main() -> None:
     parser.add_argument("--out", default=str(RESULTS_DIR / "v0_batch_results.jsonl"), help="Output JSONL path")
     parser.add_argument("--limit", type=int, default=0, help="Limit number of samples (0 = no limit)")
     parser.add_argument("--seed", type=int, default=7, help="Reserved for future deterministic sampling; v0 ignores this.")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for scoring (0 = all CPU cores)")
     args = parser.parse_args()
 
     personas = read_json(Path(args.personas))
     contexts = read_jsonl(Path(args.contexts))
-    samples = read_jsonl(Path(args.samples))
-
-    persona_by_id = {p["persona_id"]: p for p in personas}
-    context_by_id = {c["context_id"]: c for c in contexts}
+    samples = iter_jsonl(Path(args.samples))
 
     if args.limit and args.limit > 0:
-        samples = samples[: args.limit]
+        samples = itertools.islice(samples, args.limit)
 
     run_id = f"batch_{int(time.time())}"
-    rows_out = []
-
-    for s in samples:
-        sample_id = s["sample_id"]
-        context_id = s["context_id"]
-        user_text = s["user_text"]
-        use_case = s.get("use_case", "UNKNOWN")
-
-        ctx = context_by_id.get(context_id)
-        if ctx is None:
-            # If contexts are missing, still record a row with errors
-            rows_out.append({
-                "run_id": run_id,
-                "sample_id": sample_id,
-                "context_id": context_id,
-                "use_case": use_case,
-                "error": f"Missing context_id={context_id}"
-            })
-            continue
-
-        persona_id = ctx["persona_id"]
-        persona = persona_by_id.get(persona_id)
-        if persona is None:
-            rows_out.append({
-                "run_id": run_id,
-                "sample_id": sample_id,
-                "context_id": context_id,
-                "use_case": use_case,
-                "persona_id": persona_id,
-                "error": f"Missing persona_id={persona_id}"
-            })
-            continue
-
-        scores = score_message(user_text, persona, ctx)
-        ocq_val = ocq(scores)
-        safe_violation = 1 if scores["SAFE"] == 0 else 0
-
-        rows_out.append({
-            "run_id": run_id,
-            "sample_id": sample_id,
-            "context_id": context_id,
-            "use_case": ctx.get("use_case", use_case),
-            "persona_id": persona_id,
-            "user_text": user_text,
-            "scores": scores,
-            "ocq": ocq_val,
-            "safe_violation": safe_violation,
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
-        })
+    # Every row carries the run's start time (like run_id), not the moment it
+    # was scored; formatting a timestamp per row was a measurable share of the loop.
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    init_args = (personas, contexts, run_id, timestamp)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
+    # Stream shards straight to disk, in input order, as they are scored.
     out_path = Path(args.out)
-    write_jsonl(out_path, rows_out)
-    print(f"Wrote {len(rows_out)} rows to: {out_path}")
+    n_rows = 0
+    n_errors = 0
+    first_error = None
+    with out_path.open("wb", buffering=1 << 20) as out_f, ExitStack() as stack:
+        shards = iter_shards(samples)
+        if jobs == 1:
+            _init_shard_state(*init_args)
+            results = map(_score_shard, shards)
+        else:
+            pool = stack.enter_context(
+                ProcessPoolExecutor(max_workers=jobs, initializer=_init_shard_state, initargs=init_args)
+            )
+            results = _map_ordered(pool, _score_shard, shards, window=2 * jobs)
+        for blob, shard_rows, shard_errors, shard_first_error in results:
+            out_f.write(blob)
+            n_rows += shard_rows
+            n_errors += shard_errors
+            if first_error is None:
+                first_error = shard_first_error
+
+    print(f"Wrote {n_rows} rows to: {out_path}")
 
     # Quick summary of obvious data issues
-    errors = [r for r in rows_out if "error" in r]
-    if errors:
-        print(f"WARNING: {len(errors)} rows contain errors (missing context/persona). First error:")
-        print(json.dumps(errors[0], ensure_ascii=False, indent=2))
+    if first_error is not None:
+        print(f"WARNING: {n_errors} rows contain errors (missing context/persona). First error:")
+        print(json.dumps(first_error, ensure_ascii=False, indent=2))
 
 
 if __name__ == "__main__":
@@ -6,8 +6,11 @@ from typing import Dict, Any
 
 import joblib
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
+QUANT_MODES = ("fp32", "int8")
+
 
 @dataclass
 class SafetyScore:
@@ -27,15 +30,28 @@ class SafetyEmbedScorer:
       - sentence_transformer: str
       - logreg: sklearn LogisticRegression
       - normalize_embeddings: bool (optional)
+
+    quant="int8" applies PyTorch dynamic INT8 quantization to the embedder's
+    Linear layers (CPU only); the logreg head stays FP32.
     """
 
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, quant: str = "fp32"):
+        if quant not in QUANT_MODES:
+            raise ValueError(f"Unknown quant={quant!r}; expected one of {QUANT_MODES}")
         self.model_path = model_path
+        self.quant = quant
         self.artifact = joblib.load(model_path)
         self.embed_name = self.artifact["sentence_transformer"]
         self.clf = self.artifact["logreg"]
         self.normalize = bool(self.artifact.get("normalize_embeddings", True))
-        self.embedder = SentenceTransformer(self.embed_name)
+        if quant == "int8":
+            # quantized Linear kernels only run on CPU
+            embedder = SentenceTransformer(self.embed_name, device="cpu")
+            self.embedder = torch.ao.quantization.quantize_dynamic(
+                embedder, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        else:
+            self.embedder = SentenceTransformer(self.embed_name)
 
     def predict_proba_move(self, text: str) -> float:
         text = (text or "").strip()
@@ -17,11 +17,14 @@ _PATTERNS = [
 ]
 
 _COMPILED = [re.compile(p, re.IGNORECASE) for p in _PATTERNS]
+# Union of all patterns: one scan answers "any hit?" for the common benign
+# case; the per-pattern loop only runs to report which pattern matched first.
+_ANY = re.compile("|".join(f"(?:{p})" for p in _PATTERNS), re.IGNORECASE)
 
 
 def obvious_escalation(text: str) -> Tuple[bool, str]:
     t = (text or "").strip()
-    if not t:
+    if not t or not _ANY.search(t):
         return False, ""
     for rx in _COMPILED:
         if rx.search(t):
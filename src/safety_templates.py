@@ -34,8 +34,17 @@ EROTIC_ALLOWED_GUIDANCE = (
 )
 
 
+# Shared default PRNG: seeded once per process instead of on every reply.
+_RNG = random.Random()
+
+
+def seed_templates(seed: int) -> None:
+    """Seed the default PRNG used when no `rng` is passed (for reproducible runs)."""
+    _RNG.seed(seed)
+
+
 def boundary_safe_reply(rng: random.Random | None = None) -> str:
-    rng = rng or random.Random()
+    rng = rng or _RNG
     base = rng.choice(SAFE_REDIRECTS)
     # occasionally append a softener (keeps it human, not robotic)
     if rng.random() < 0.35:
@@ -96,7 +105,7 @@ def boundary_safe_reply_contextual(
     trust: float,
     rng: random.Random | None = None,
 ) -> str:
-    rng = rng or random.Random()
+    rng = rng or _RNG
     ack = _infer_ack(user_text)
     if bot_profile.humor_style == "playful" and rng.random() < 0.35:
         ack = f"that’s kind of cute — {ack}"
@@ -114,7 +123,7 @@ def boundary_safe_reply_contextual(
 
 
 def soft_deflect_reply(rng: random.Random | None = None) -> str:
-    rng = rng or random.Random()
+    rng = rng or _RNG
     base = rng.choice(SOFT_DEFLECTS)
     if rng.random() < 0.30:
         base = f"{base} {rng.choice(SOFTENERS)}"
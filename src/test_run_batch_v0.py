@@ -0,0 +1,86 @@
+# src/test_run_batch_v0.py
+import tempfile
+from pathlib import Path
+
+from src.run_batch_v0 import MARKER_CATEGORIES, iter_jsonl, marker_hits, score_message
+
+PERSONA = {"name": "June", "interests": ["hiking"]}
+UC4 = {"use_case": "UC4_BOUNDARY"}
+
+
+def _substring_hits(tl: str) -> set:
+    # Reference: the original per-category `any(x in tl for x in markers)` checks.
+    return {cat for cat, ms in MARKER_CATEGORIES.items() if any(m in tl for m in ms)}
+
+
+def test_marker_hits_match_substring_checks() -> None:
+    texts = [
+        "",
+        "why not",
+        "why not come over tonight",
+        "no worries, take it slow",
+        "nice shotgun",
+        "that's fairly sensitive",
+        "grab a coffee and walk to meet",
+        "whatever, you owe me. thanks!",
+        "berlin profile your bio",
+        "sexy hot tits",
+        " ".join(m for ms in MARKER_CATEGORIES.values() for m in sorted(ms)),
+    ]
+    for tl in texts:
+        assert marker_hits(tl) == _substring_hits(tl), tl
+
+
+def test_why_not_is_unsafe() -> None:
+    # "why not" is an unsafe marker; the bare interrogative "why" only lifts ENG.
+    assert marker_hits("why not") == {"unsafe"}
+    scores = score_message("Why not?", PERSONA, UC4)
+    assert scores["SAFE"] == 0 and scores["MOVE"] == 0 and scores["ENG"] == 2, scores
+
+    scores = score_message("Why do you ask", PERSONA, UC4)
+    assert scores["SAFE"] == 1 and scores["ENG"] == 2, scores
+
+
+def test_no_worries_is_soft_and_uc4_ok() -> None:
+    assert marker_hits("no worries") == {"soft", "uc4_ok"}
+    scores = score_message("No worries at all", PERSONA, UC4)
+    assert scores["TONE"] == 2 and scores["SAFE"] == 2 and scores["MOVE"] == 2, scores
+
+
+def test_hot_inside_shotgun_is_objectifying() -> None:
+    # Plain substring semantics: "hot" inside "shotgun" still counts.
+    assert "obj" in marker_hits("nice shotgun")
+    scores = score_message("Nice shotgun, thanks", PERSONA, {"use_case": "UC1_COLD_OPEN"})
+    assert scores["TONE"] == 0, scores
+
+
+def _read(raw: bytes) -> list:
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "rows.jsonl"
+        path.write_bytes(raw)
+        return list(iter_jsonl(path))
+
+
+def test_iter_jsonl_empty_file() -> None:
+    assert _read(b"") == []
+
+
+def test_iter_jsonl_crlf_and_blank_lines() -> None:
+    rows = _read(b'{"a": 1}\r\n\r\n\n{"a": 2}\r\n   \n')
+    assert rows == [{"a": 1}, {"a": 2}], rows
+
+
+def test_iter_jsonl_missing_final_newline() -> None:
+    rows = _read(b'{"a": 1}\n{"a": 2}')
+    assert rows == [{"a": 1}, {"a": 2}], rows
+
+
+if __name__ == "__main__":
+    test_marker_hits_match_substring_checks()
+    test_why_not_is_unsafe()
+    test_no_worries_is_soft_and_uc4_ok()
+    test_hot_inside_shotgun_is_objectifying()
+    test_iter_jsonl_empty_file()
+    test_iter_jsonl_crlf_and_blank_lines()
+    test_iter_jsonl_missing_final_newline()
+    print("[OK] run_batch_v0 tests passed")